@@ -0,0 +1,156 @@
+"""
+Shared fixtures for the backend test suite
+"""
+
+import httpx
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+from dag_analyzer import DAGAnalyzer
+from main import app
+
+
+# Shared request bodies. The session fixtures below serialize each one once
+# with orjson; tests post the bytes with content= rather than json=, with
+# helpers.JSON_HDR as the content type.
+SINGLE_NODE_PAYLOAD = {
+    "nodes": [{
+        "id": "node1",
+        "type": "input",
+        "data": {},
+        "position": {"x": 0, "y": 0}
+    }],
+    "edges": []
+}
+
+TWO_NODE_CHAIN_PAYLOAD = {
+    "nodes": [
+        {
+            "id": "node1",
+            "type": "input",
+            "data": {"value": "test"},
+            "position": {"x": 0, "y": 0}
+        },
+        {
+            "id": "node2",
+            "type": "output",
+            "data": {},
+            "position": {"x": 100, "y": 0}
+        }
+    ],
+    "edges": [{
+        "id": "edge1",
+        "source": "node1",
+        "target": "node2",
+        "sourceHandle": "out",
+        "targetHandle": "in"
+    }]
+}
+
+COMPLEX_DAG_PAYLOAD = {
+    "nodes": [
+        {"id": "input1", "type": "input", "data": {}, "position": {"x": 0, "y": 0}},
+        {"id": "input2", "type": "input", "data": {}, "position": {"x": 0, "y": 100}},
+        {"id": "process1", "type": "transform", "data": {}, "position": {"x": 200, "y": 50}},
+        {"id": "output1", "type": "output", "data": {}, "position": {"x": 400, "y": 50}}
+    ],
+    "edges": [
+        {"id": "e1", "source": "input1", "target": "process1", "sourceHandle": "out", "targetHandle": "in1"},
+        {"id": "e2", "source": "input2", "target": "process1", "sourceHandle": "out", "targetHandle": "in2"},
+        {"id": "e3", "source": "process1", "target": "output1", "sourceHandle": "out", "targetHandle": "in"}
+    ]
+}
+
+CYCLIC_PAYLOAD = {
+    "nodes": [
+        {"id": "node1", "type": "input", "data": {}, "position": {"x": 0, "y": 0}},
+        {"id": "node2", "type": "process", "data": {}, "position": {"x": 100, "y": 0}},
+        {"id": "node3", "type": "process", "data": {}, "position": {"x": 200, "y": 0}}
+    ],
+    "edges": [
+        {"id": "e1", "source": "node1", "target": "node2", "sourceHandle": "out", "targetHandle": "in"},
+        {"id": "e2", "source": "node2", "target": "node3", "sourceHandle": "out", "targetHandle": "in"},
+        {"id": "e3", "source": "node3", "target": "node1", "sourceHandle": "out", "targetHandle": "in"}  # Creates cycle
+    ]
+}
+
+
+def build_large_payload():
+    """Valid 100-node chain pipeline"""
+    ids = tuple(f"node_{i}" for i in range(100))
+    nodes = [
+        {"id": ids[i], "type": "process", "data": {"index": i}, "position": {"x": i * 50, "y": 0}}
+        for i in range(100)
+    ]
+    edges = [
+        {"id": f"edge_{i-1}_{i}", "source": ids[i - 1], "target": ids[i], "sourceHandle": "out", "targetHandle": "in"}
+        for i in range(1, 100)
+    ]
+    
+    return {
+        "nodes": nodes,
+        "edges": edges
+    }
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Single TestClient for the whole session so app startup runs once"""
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    """Run @pytest.mark.anyio tests on asyncio only"""
+    return "asyncio"
+
+
+@pytest.fixture
+async def async_client():
+    """AsyncClient calling the ASGI app in-process, without TestClient's thread hop"""
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver") as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def single_node_payload():
+    return orjson.dumps(SINGLE_NODE_PAYLOAD)
+
+
+@pytest.fixture(scope="session")
+def two_node_chain_payload():
+    return orjson.dumps(TWO_NODE_CHAIN_PAYLOAD)
+
+
+@pytest.fixture(scope="session")
+def complex_dag_payload():
+    return orjson.dumps(COMPLEX_DAG_PAYLOAD)
+
+
+@pytest.fixture(scope="session")
+def metadata_payload():
+    return orjson.dumps({
+        **SINGLE_NODE_PAYLOAD,
+        "metadata": {
+            "version": "2.0.0",
+            "created": "2024-01-01T00:00:00Z",
+            "modified": "2024-01-01T00:00:00Z"
+        }
+    })
+
+
+@pytest.fixture(scope="session")
+def cyclic_payload():
+    return orjson.dumps(CYCLIC_PAYLOAD)
+
+
+@pytest.fixture(scope="session")
+def large_payload():
+    return orjson.dumps(build_large_payload())
+
+
+@pytest.fixture
+def analyzer():
+    """Fresh DAGAnalyzer per test; function scope keeps tests independent under xdist"""
+    return DAGAnalyzer()
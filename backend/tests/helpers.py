@@ -0,0 +1,25 @@
+"""
+Plain helpers shared by the backend test modules
+"""
+
+import orjson
+
+
+# Content type for the pre-serialized payload fixtures posted with content=
+JSON_HDR = {"Content-Type": "application/json"}
+
+
+def rj(response):
+    """Decode a response body with orjson"""
+    return orjson.loads(response.content)
+
+
+def has(texts, needle):
+    """True if needle occurs in any of texts (one scan over the newline-joined strings)"""
+    return needle in "\n".join(texts)
+
+
+def is_number(value):
+    """Exact int/float check; decoded JSON numbers are never subclasses"""
+    t = type(value)
+    return t is int or t is float
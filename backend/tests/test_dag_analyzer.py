@@ -6,21 +6,55 @@ and various edge cases for the DAGAnalyzer class.
 """
 
 import pytest
+from dataclasses import dataclass
 from typing import List
-from dag_analyzer import DAGAnalyzer
 from models import EdgeData
 
 
+@dataclass(slots=True)
+class MockEdge:
+    """Plain edge stand-in for cases EdgeData validation rejects (e.g. self-loops)."""
+    id: str
+    source: str
+    target: str
+    sourceHandle: str
+    targetHandle: str
+
+
+# Node ids for the 100-node chain in test_large_dag
+_STR = [str(i) for i in range(100)]
+
+# (edges, expected stats) for acyclic graphs; every edge is also an ordering constraint
+DAG_CASES = [
+    pytest.param(
+        [("A", "B"), ("B", "C")],
+        {"node_count": 3, "edge_count": 2, "max_in_degree": 1, "max_out_degree": 1},
+        id="simple",
+    ),
+    pytest.param(
+        [("A", "B"), ("A", "C"), ("B", "D"), ("C", "D")],
+        {"node_count": 4, "edge_count": 4, "max_in_degree": 2, "max_out_degree": 2},
+        id="diamond",
+    ),
+    pytest.param(
+        [("A", "B"), ("C", "D"), ("D", "E")],
+        {"node_count": 5, "edge_count": 3},
+        id="disconnected_components",
+    ),
+    pytest.param(
+        [("A", "D"), ("B", "D"), ("C", "E"), ("D", "F"), ("E", "F"), ("F", "G")],
+        {"node_count": 7, "edge_count": 6, "max_in_degree": 2},
+        id="kahn_correctness",
+    ),
+]
+
+
 class TestDAGAnalyzer:
     """Test suite for DAGAnalyzer class."""
     
-    def setup_method(self):
-        """Set up test fixtures before each test method."""
-        self.analyzer = DAGAnalyzer()
-    
     def create_edge(self, source: str, target: str, source_handle: str = "out", target_handle: str = "in") -> EdgeData:
-        """Helper method to create EdgeData objects."""
-        return EdgeData(
+        """Helper method to create EdgeData objects (inputs are trusted, so validation is skipped)."""
+        return EdgeData.model_construct(
             id=f"{source}-{target}",
             source=source,
             target=target,
@@ -28,90 +62,64 @@ class TestDAGAnalyzer:
             targetHandle=target_handle
         )
     
-    def test_empty_graph(self):
+    def _assert_order(self, topo_order: List[str], pairs) -> None:
+        """Assert that each (before, after) pair appears in that order."""
+        pos = {node: i for i, node in enumerate(topo_order)}
+        for before, after in pairs:
+            assert pos[before] < pos[after], f"{before} should precede {after}"
+    
+    def test_empty_graph(self, analyzer):
         """Test behavior with empty graph."""
-        self.analyzer.build_graph([])
+        analyzer.build_graph([])
         
-        assert self.analyzer.is_dag() is True
-        assert self.analyzer.detect_cycles() == []
-        assert self.analyzer.get_topological_order() == []
-        assert self.analyzer.get_graph_stats()["node_count"] == 0
-        assert self.analyzer.get_graph_stats()["edge_count"] == 0
+        assert analyzer.is_dag() is True
+        assert analyzer.detect_cycles() == []
+        assert analyzer.get_topological_order() == []
+        assert analyzer.get_graph_stats()["node_count"] == 0
+        assert analyzer.get_graph_stats()["edge_count"] == 0
     
-    def test_single_node_no_edges(self):
+    def test_single_node_no_edges(self, analyzer):
         """Test graph with single isolated node."""
         # Single node with no edges - need to provide node_ids
         node_ids = {"A"}
-        self.analyzer.build_graph([], node_ids)
+        analyzer.build_graph([], node_ids)
         
-        assert self.analyzer.is_dag() is True
-        assert self.analyzer.detect_cycles() == []
-        assert self.analyzer.get_topological_order() == []
-        stats = self.analyzer.get_graph_stats()
+        assert analyzer.is_dag() is True
+        assert analyzer.detect_cycles() == []
+        assert analyzer.get_topological_order() == []
+        stats = analyzer.get_graph_stats()
         assert stats["node_count"] == 0  # No nodes added without edges
         assert stats["edge_count"] == 0
     
-    def test_simple_dag(self):
-        """Test simple directed acyclic graph: A -> B -> C."""
-        edges = [
-            self.create_edge("A", "B"),
-            self.create_edge("B", "C")
-        ]
-        self.analyzer.build_graph(edges)
+    @pytest.mark.parametrize("edges,stats", DAG_CASES)
+    def test_dag(self, analyzer, edges, stats):
+        """Test that acyclic graphs yield a topological order honouring every edge."""
+        analyzer.build_graph([self.create_edge(src, tgt) for src, tgt in edges])
         
-        assert self.analyzer.is_dag() is True
-        assert self.analyzer.detect_cycles() == []
+        assert analyzer.is_dag() is True
+        assert analyzer.detect_cycles() == []
         
-        topo_order = self.analyzer.get_topological_order()
+        topo_order = analyzer.get_topological_order()
         assert topo_order is not None
-        assert len(topo_order) == 3
-        assert topo_order.index("A") < topo_order.index("B")
-        assert topo_order.index("B") < topo_order.index("C")
+        assert len(topo_order) == stats["node_count"]
         
-        stats = self.analyzer.get_graph_stats()
-        assert stats["node_count"] == 3
-        assert stats["edge_count"] == 2
-        assert stats["max_in_degree"] == 1
-        assert stats["max_out_degree"] == 1
-    
-    def test_diamond_dag(self):
-        """Test diamond-shaped DAG: A -> B,C -> D."""
-        edges = [
-            self.create_edge("A", "B"),
-            self.create_edge("A", "C"),
-            self.create_edge("B", "D"),
-            self.create_edge("C", "D")
-        ]
-        self.analyzer.build_graph(edges)
+        self._assert_order(topo_order, edges)
         
-        assert self.analyzer.is_dag() is True
-        assert self.analyzer.detect_cycles() == []
-        
-        topo_order = self.analyzer.get_topological_order()
-        assert topo_order is not None
-        assert len(topo_order) == 4
-        assert topo_order.index("A") < topo_order.index("B")
-        assert topo_order.index("A") < topo_order.index("C")
-        assert topo_order.index("B") < topo_order.index("D")
-        assert topo_order.index("C") < topo_order.index("D")
-        
-        stats = self.analyzer.get_graph_stats()
-        assert stats["node_count"] == 4
-        assert stats["edge_count"] == 4
-        assert stats["max_in_degree"] == 2  # Node D has 2 incoming edges
-        assert stats["max_out_degree"] == 2  # Node A has 2 outgoing edges
+        actual = analyzer.get_graph_stats()
+        for key, expected in stats.items():
+            assert actual[key] == expected
     
-    def test_simple_cycle(self):
+    def test_simple_cycle(self, analyzer):
         """Test simple cycle: A -> B -> A."""
         edges = [
             self.create_edge("A", "B"),
             self.create_edge("B", "A")
         ]
-        self.analyzer.build_graph(edges)
+        analyzer.build_graph(edges)
         
-        assert self.analyzer.is_dag() is False
+        assert analyzer.is_dag() is False
         
-        cycles = self.analyzer.detect_cycles()
+        cycles = analyzer.detect_cycles()
         assert len(cycles) >= 1
         # Should detect cycle containing A and B
         cycle_nodes = set()
@@ -120,34 +128,25 @@ class TestDAGAnalyzer:
         assert "A" in cycle_nodes
         assert "B" in cycle_nodes
         
-        assert self.analyzer.get_topological_order() is None
+        assert analyzer.get_topological_order() is None
     
-    def test_self_loop(self):
+    def test_self_loop(self, analyzer):
         """Test self-loop: A -> A."""
-        # Create a mock edge object for self-loop testing
-        class MockEdge:
-            def __init__(self, id, source, target, sourceHandle, targetHandle):
-                self.id = id
-                self.source = source
-                self.target = target
-                self.sourceHandle = sourceHandle
-                self.targetHandle = targetHandle
-        
         edge = MockEdge("A-A", "A", "A", "out", "in")
         edges = [edge]
-        self.analyzer.build_graph(edges)
+        analyzer.build_graph(edges)
         
-        assert self.analyzer.is_dag() is False
+        assert analyzer.is_dag() is False
         
-        cycles = self.analyzer.detect_cycles()
+        cycles = analyzer.detect_cycles()
         assert len(cycles) >= 1
         # Should detect self-loop
         found_self_loop = any("A" in cycle for cycle in cycles)
         assert found_self_loop
         
-        assert self.analyzer.get_topological_order() is None
+        assert analyzer.get_topological_order() is None
     
-    def test_complex_cycle(self):
+    def test_complex_cycle(self, analyzer):
         """Test complex cycle: A -> B -> C -> D -> B."""
         edges = [
             self.create_edge("A", "B"),
@@ -155,11 +154,11 @@ class TestDAGAnalyzer:
             self.create_edge("C", "D"),
             self.create_edge("D", "B")  # Creates cycle B -> C -> D -> B
         ]
-        self.analyzer.build_graph(edges)
+        analyzer.build_graph(edges)
         
-        assert self.analyzer.is_dag() is False
+        assert analyzer.is_dag() is False
         
-        cycles = self.analyzer.detect_cycles()
+        cycles = analyzer.detect_cycles()
         assert len(cycles) >= 1
         # Should detect cycle containing B, C, D
         cycle_nodes = set()
@@ -169,9 +168,9 @@ class TestDAGAnalyzer:
         assert "C" in cycle_nodes
         assert "D" in cycle_nodes
         
-        assert self.analyzer.get_topological_order() is None
+        assert analyzer.get_topological_order() is None
     
-    def test_multiple_cycles(self):
+    def test_multiple_cycles(self, analyzer):
         """Test graph with multiple independent cycles."""
         edges = [
             # First cycle: A -> B -> A
@@ -181,11 +180,11 @@ class TestDAGAnalyzer:
             self.create_edge("C", "D"),
             self.create_edge("D", "C")
         ]
-        self.analyzer.build_graph(edges)
+        analyzer.build_graph(edges)
         
-        assert self.analyzer.is_dag() is False
+        assert analyzer.is_dag() is False
         
-        cycles = self.analyzer.detect_cycles()
+        cycles = analyzer.detect_cycles()
         assert len(cycles) >= 2
         
         # Collect all nodes involved in cycles
@@ -199,36 +198,9 @@ class TestDAGAnalyzer:
         assert "C" in cycle_nodes
         assert "D" in cycle_nodes
         
-        assert self.analyzer.get_topological_order() is None
+        assert analyzer.get_topological_order() is None
     
-    def test_disconnected_components_dag(self):
-        """Test DAG with disconnected components."""
-        edges = [
-            # Component 1: A -> B
-            self.create_edge("A", "B"),
-            # Component 2: C -> D -> E
-            self.create_edge("C", "D"),
-            self.create_edge("D", "E")
-        ]
-        self.analyzer.build_graph(edges)
-        
-        assert self.analyzer.is_dag() is True
-        assert self.analyzer.detect_cycles() == []
-        
-        topo_order = self.analyzer.get_topological_order()
-        assert topo_order is not None
-        assert len(topo_order) == 5
-        
-        # Verify ordering within components
-        assert topo_order.index("A") < topo_order.index("B")
-        assert topo_order.index("C") < topo_order.index("D")
-        assert topo_order.index("D") < topo_order.index("E")
-        
-        stats = self.analyzer.get_graph_stats()
-        assert stats["node_count"] == 5
-        assert stats["edge_count"] == 3
-    
-    def test_disconnected_components_with_cycle(self):
+    def test_disconnected_components_with_cycle(self, analyzer):
         """Test graph with one DAG component and one cyclic component."""
         edges = [
             # DAG component: A -> B -> C
@@ -238,11 +210,11 @@ class TestDAGAnalyzer:
             self.create_edge("D", "E"),
             self.create_edge("E", "D")
         ]
-        self.analyzer.build_graph(edges)
+        analyzer.build_graph(edges)
         
-        assert self.analyzer.is_dag() is False
+        assert analyzer.is_dag() is False
         
-        cycles = self.analyzer.detect_cycles()
+        cycles = analyzer.detect_cycles()
         assert len(cycles) >= 1
         
         # Should detect cycle in D-E component
@@ -252,35 +224,36 @@ class TestDAGAnalyzer:
         assert "D" in cycle_nodes
         assert "E" in cycle_nodes
         
-        assert self.analyzer.get_topological_order() is None
+        assert analyzer.get_topological_order() is None
     
-    def test_large_dag(self):
+    def test_large_dag(self, analyzer):
         """Test performance with larger DAG."""
         # Create a chain: 0 -> 1 -> 2 -> ... -> 99
-        edges = []
-        for i in range(99):
-            edges.append(self.create_edge(str(i), str(i + 1)))
+        chain = list(zip(_STR, _STR[1:]))
+        edges = [
+            EdgeData.model_construct(id=f"{a}-{b}", source=a, target=b, sourceHandle="out", targetHandle="in")
+            for a, b in chain
+        ]
         
-        self.analyzer.build_graph(edges)
+        analyzer.build_graph(edges)
         
-        assert self.analyzer.is_dag() is True
-        assert self.analyzer.detect_cycles() == []
+        assert analyzer.is_dag() is True
+        assert analyzer.detect_cycles() == []
         
-        topo_order = self.analyzer.get_topological_order()
+        topo_order = analyzer.get_topological_order()
         assert topo_order is not None
         assert len(topo_order) == 100
         
         # Verify correct ordering
-        for i in range(99):
-            assert topo_order.index(str(i)) < topo_order.index(str(i + 1))
+        self._assert_order(topo_order, chain)
         
-        stats = self.analyzer.get_graph_stats()
+        stats = analyzer.get_graph_stats()
         assert stats["node_count"] == 100
         assert stats["edge_count"] == 99
         assert stats["max_in_degree"] == 1
         assert stats["max_out_degree"] == 1
     
-    def test_build_graph_with_node_validation(self):
+    def test_build_graph_with_node_validation(self, analyzer):
         """Test graph building with node ID validation."""
         edges = [
             self.create_edge("A", "B"),
@@ -289,44 +262,35 @@ class TestDAGAnalyzer:
         
         # Valid node IDs
         valid_node_ids = {"A", "B", "C"}
-        self.analyzer.build_graph(edges, valid_node_ids)
-        assert self.analyzer.is_dag() is True
+        analyzer.build_graph(edges, valid_node_ids)
+        assert analyzer.is_dag() is True
         
         # Invalid node IDs - missing node C
         invalid_node_ids = {"A", "B"}
         with pytest.raises(ValueError, match="references non-existent node"):
-            self.analyzer.build_graph(edges, invalid_node_ids)
+            analyzer.build_graph(edges, invalid_node_ids)
     
-    def test_graph_validation(self):
+    def test_graph_validation(self, analyzer):
         """Test comprehensive graph structure validation."""
         # Valid DAG
         edges = [
             self.create_edge("A", "B"),
             self.create_edge("B", "C")
         ]
-        self.analyzer.build_graph(edges)
-        is_valid, errors = self.analyzer.validate_graph_structure()
+        analyzer.build_graph(edges)
+        is_valid, errors = analyzer.validate_graph_structure()
         assert is_valid is True
         assert len(errors) == 0
         
         # Graph with self-loop
-        # Create a mock edge object for self-loop testing
-        class MockEdge:
-            def __init__(self, id, source, target, sourceHandle, targetHandle):
-                self.id = id
-                self.source = source
-                self.target = target
-                self.sourceHandle = sourceHandle
-                self.targetHandle = targetHandle
-        
         edge_self_loop = MockEdge("B-B", "B", "B", "out", "in")
         
         edges_with_self_loop = [
             self.create_edge("A", "B"),
             edge_self_loop  # Self-loop
         ]
-        self.analyzer.build_graph(edges_with_self_loop)
-        is_valid, errors = self.analyzer.validate_graph_structure()
+        analyzer.build_graph(edges_with_self_loop)
+        is_valid, errors = analyzer.validate_graph_structure()
         assert is_valid is False
         assert any("Self-loop" in error for error in errors)
         
@@ -335,8 +299,8 @@ class TestDAGAnalyzer:
             self.create_edge("A", "B"),
             self.create_edge("B", "A")  # Cycle
         ]
-        self.analyzer.build_graph(edges_with_cycle)
-        is_valid, errors = self.analyzer.validate_graph_structure()
+        analyzer.build_graph(edges_with_cycle)
+        is_valid, errors = analyzer.validate_graph_structure()
         assert is_valid is False
         assert any("Cycle" in error for error in errors)
         
@@ -345,28 +309,28 @@ class TestDAGAnalyzer:
             self.create_edge("A", "B"),
             self.create_edge("A", "B")  # Duplicate
         ]
-        self.analyzer.build_graph(edges_with_duplicates)
-        is_valid, errors = self.analyzer.validate_graph_structure()
+        analyzer.build_graph(edges_with_duplicates)
+        is_valid, errors = analyzer.validate_graph_structure()
         assert is_valid is False
         assert any("Duplicate edge" in error for error in errors)
     
-    def test_edge_cases(self):
+    def test_edge_cases(self, analyzer):
         """Test various edge cases and boundary conditions."""
         # Graph with only one edge
         edges = [self.create_edge("A", "B")]
-        self.analyzer.build_graph(edges)
-        assert self.analyzer.is_dag() is True
-        assert len(self.analyzer.get_topological_order()) == 2
+        analyzer.build_graph(edges)
+        assert analyzer.is_dag() is True
+        assert len(analyzer.get_topological_order()) == 2
         
         # Graph with high fan-out (one node connects to many)
         edges = []
         for i in range(10):
             edges.append(self.create_edge("root", f"child_{i}"))
         
-        self.analyzer.build_graph(edges)
-        assert self.analyzer.is_dag() is True
+        analyzer.build_graph(edges)
+        assert analyzer.is_dag() is True
         
-        stats = self.analyzer.get_graph_stats()
+        stats = analyzer.get_graph_stats()
         assert stats["max_out_degree"] == 10
         assert stats["max_in_degree"] == 1
         
@@ -375,41 +339,14 @@ class TestDAGAnalyzer:
         for i in range(10):
             edges.append(self.create_edge(f"parent_{i}", "sink"))
         
-        self.analyzer.build_graph(edges)
-        assert self.analyzer.is_dag() is True
+        analyzer.build_graph(edges)
+        assert analyzer.is_dag() is True
         
-        stats = self.analyzer.get_graph_stats()
+        stats = analyzer.get_graph_stats()
         assert stats["max_out_degree"] == 1
         assert stats["max_in_degree"] == 10
     
-    def test_kahn_algorithm_correctness(self):
-        """Test that Kahn's algorithm produces correct topological ordering."""
-        # Create a more complex DAG to test ordering
-        edges = [
-            self.create_edge("A", "D"),
-            self.create_edge("B", "D"),
-            self.create_edge("C", "E"),
-            self.create_edge("D", "F"),
-            self.create_edge("E", "F"),
-            self.create_edge("F", "G")
-        ]
-        self.analyzer.build_graph(edges)
-        
-        assert self.analyzer.is_dag() is True
-        
-        topo_order = self.analyzer.get_topological_order()
-        assert topo_order is not None
-        assert len(topo_order) == 7
-        
-        # Verify all ordering constraints are satisfied
-        assert topo_order.index("A") < topo_order.index("D")
-        assert topo_order.index("B") < topo_order.index("D")
-        assert topo_order.index("C") < topo_order.index("E")
-        assert topo_order.index("D") < topo_order.index("F")
-        assert topo_order.index("E") < topo_order.index("F")
-        assert topo_order.index("F") < topo_order.index("G")
-    
-    def test_cycle_detection_accuracy(self):
+    def test_cycle_detection_accuracy(self, analyzer):
         """Test that cycle detection finds all cycles accurately."""
         # Create graph with known cycle structure
         edges = [
@@ -418,19 +355,133 @@ class TestDAGAnalyzer:
             self.create_edge("C", "A"),  # Cycle: A -> B -> C -> A
             self.create_edge("D", "E"),  # Separate component (no cycle)
         ]
-        self.analyzer.build_graph(edges)
+        analyzer.build_graph(edges)
         
-        assert self.analyzer.is_dag() is False
+        assert analyzer.is_dag() is False
         
-        cycles = self.analyzer.detect_cycles()
+        cycles = analyzer.detect_cycles()
         assert len(cycles) >= 1
         
         # Verify the cycle contains the expected nodes
-        cycle_found = False
-        for cycle in cycles:
-            cycle_set = set(cycle[:-1])  # Remove duplicate last node
-            if cycle_set == {"A", "B", "C"}:
-                cycle_found = True
-                break
+        cycle_keys = {frozenset(cycle[:-1]) for cycle in cycles}  # Drop repeated last node
+        assert frozenset({"A", "B", "C"}) in cycle_keys, f"Expected cycle A-B-C not found in {cycles}"
+    
+    def test_analysis_cache_invalidated_on_rebuild(self, analyzer):
+        """Test that cached analysis results are discarded when the graph is rebuilt."""
+        analyzer.build_graph([self.create_edge("A", "B")])
+        assert analyzer.is_dag() is True
+        assert analyzer.get_topological_order() == ["A", "B"]
+        
+        analyzer.build_graph([
+            self.create_edge("A", "B"),
+            self.create_edge("B", "A")
+        ])
+        assert analyzer.is_dag() is False
+        assert analyzer.get_topological_order() is None
+    
+    def test_reset(self, analyzer):
+        """Test that reset() discards the graph and its cached analysis."""
+        analyzer.build_graph([
+            self.create_edge("A", "B"),
+            self.create_edge("B", "A")
+        ])
+        assert analyzer.is_dag() is False
+        
+        analyzer.reset()
+        assert analyzer.is_dag() is True
+        assert analyzer.detect_cycles() == []
+        assert analyzer.get_topological_order() == []
+        assert analyzer.get_graph_stats()["node_count"] == 0
+    
+    def test_parallel_back_edges_reported_once(self, analyzer):
+        """Test that parallel edges closing the same cycle yield a single cycle."""
+        analyzer.build_graph([
+            self.create_edge("A", "B"),
+            self.create_edge("B", "A"),
+            self.create_edge("B", "A", source_handle="out2")
+        ])
+        
+        assert analyzer.detect_cycles() == [["A", "B", "A"]]
+    
+    def test_detect_cycles_memoized(self, analyzer):
+        """Test that cycle results are cached and callers receive independent copies."""
+        analyzer.build_graph([
+            self.create_edge("A", "B"),
+            self.create_edge("B", "A")
+        ])
+        first = analyzer.detect_cycles()
+        first[0].append("X")
+        
+        assert analyzer.detect_cycles() == [["A", "B", "A"]]
+        
+        analyzer.build_graph([self.create_edge("A", "B")])
+        assert analyzer.detect_cycles() == []
+    
+    def test_deep_chain_cycle_detection(self, analyzer):
+        """Test that cycle detection handles chains deeper than the recursion limit."""
+        edges = [self.create_edge(str(i), str(i + 1)) for i in range(5000)]
+        analyzer.build_graph(edges)
+        
+        assert analyzer.detect_cycles() == []
+    
+    def test_deep_ring_cycle_detection(self, analyzer):
+        """Test that a cycle longer than the recursion limit is found in full."""
+        edges = [self.create_edge(str(i), str((i + 1) % 5000)) for i in range(5000)]
+        analyzer.build_graph(edges)
+        
+        cycles = analyzer.detect_cycles()
+        assert len(cycles) == 1
+        assert len(cycles[0]) == 5001
+        assert cycles[0][0] == cycles[0][-1] == "0"
+    
+    def test_duplicate_edges_reported_once(self, analyzer):
+        """Test that repeated duplicate edges produce a single validation error."""
+        edges = [self.create_edge("A", "B") for _ in range(3)]
+        edges.append(self.create_edge("A", "B", source_handle="out2"))  # Distinct handle
+        analyzer.build_graph(edges)
+        
+        is_valid, errors = analyzer.validate_graph_structure()
+        assert is_valid is False
+        assert errors == ["Duplicate edge detected: A -> B"]
+    
+    def test_find_one_cycle(self, analyzer):
+        """Test that find_one_cycle returns a single closed cycle or None."""
+        analyzer.build_graph([
+            self.create_edge("A", "B"),
+            self.create_edge("B", "C")
+        ])
+        assert analyzer.find_one_cycle() is None
         
-        assert cycle_found, f"Expected cycle A-B-C not found in {cycles}"
\ No newline at end of file
+        analyzer.build_graph([
+            self.create_edge("X", "A"),
+            self.create_edge("A", "B"),
+            self.create_edge("B", "C"),
+            self.create_edge("C", "A"),
+            self.create_edge("C", "D"),
+            self.create_edge("D", "C")
+        ])
+        cycle = analyzer.find_one_cycle()
+        assert cycle is not None
+        assert cycle[0] == cycle[-1]
+        assert set(cycle) in ({"A", "B", "C"}, {"C", "D"})
+    
+    def test_forward_edge_fast_path(self, analyzer):
+        """Test graphs whose edges all point forward in first-seen order."""
+        # Chain and fan-out listed source-to-sink
+        analyzer.build_graph([
+            self.create_edge("A", "B"),
+            self.create_edge("B", "C"),
+            self.create_edge("B", "D")
+        ])
+        assert analyzer.is_dag() is True
+        assert analyzer.get_topological_order() == ["A", "B", "C", "D"]
+        
+        # A chain plus a disjoint two-node cycle: every in/out-degree is at most 1,
+        # yet the graph is not a DAG
+        analyzer.build_graph([
+            self.create_edge("A", "B"),
+            self.create_edge("C", "D"),
+            self.create_edge("D", "C")
+        ])
+        assert analyzer.is_dag() is False
+        assert analyzer.get_topological_order() is None
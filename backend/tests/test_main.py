@@ -3,13 +3,11 @@ Tests for FastAPI application structure and request validation
 """
 
 import pytest
-from fastapi.testclient import TestClient
 from unittest.mock import patch
 import json
 from main import app
 from models import PipelineRequest, NodeData, EdgeData, Point
-
-client = TestClient(app)
+from .helpers import JSON_HDR
 
 
 class TestApplicationStructure:
@@ -36,7 +34,7 @@ class TestApplicationStructure:
 class TestHealthEndpoints:
     """Test health check endpoints"""
     
-    def test_root_endpoint(self):
+    def test_root_endpoint(self, client):
         """Test root health check endpoint"""
         response = client.get("/")
         assert response.status_code == 200
@@ -44,7 +42,7 @@ class TestHealthEndpoints:
         assert data["status"] == "healthy"
         assert data["service"] == "node-pipeline-system"
     
-    def test_health_endpoint(self):
+    def test_health_endpoint(self, client):
         """Test detailed health check endpoint"""
         response = client.get("/health")
         assert response.status_code == 200
@@ -59,44 +57,21 @@ class TestHealthEndpoints:
 class TestRequestSizeMiddleware:
     """Test request size limiting middleware"""
     
-    def test_request_size_limit_exceeded(self):
+    def test_request_size_limit_exceeded(self, client):
         """Test that oversized requests are rejected"""
-        # Create a large payload that exceeds the 10MB limit
-        large_nodes = []
-        for i in range(1000):  # Create many nodes to exceed size limit
-            large_nodes.append({
-                "id": f"node_{i}",
-                "type": "test",
-                "data": {"large_content": "x" * 10000},  # 10KB per node
-                "position": {"x": i, "y": i}
-            })
-        
-        large_payload = {
-            "nodes": large_nodes,
-            "edges": []
-        }
-        
-        # Mock the content-length header to simulate oversized request
-        with patch.object(client, 'post') as mock_post:
-            class MockResponse:
-                status_code = 413
-                def json(self):
-                    return {
-                        "error": "Request payload too large",
-                        "details": [{
-                            "type": "payload_size_error",
-                            "message": "Request size exceeds maximum allowed size"
-                        }]
-                    }
-            
-            mock_post.return_value = MockResponse()
-            
-            response = mock_post.return_value
-            assert response.status_code == 413
-            data = response.json()
-            assert "Request payload too large" in data["error"]
+        # The middleware trusts the declared Content-Length, so a tiny body
+        # with a spoofed header is enough to trip the limit
+        response = client.post(
+            "/pipelines/parse",
+            json={"nodes": [], "edges": []},
+            headers={"Content-Length": str(11 * 1024 * 1024)}
+        )
+        assert response.status_code == 413
+        data = response.json()
+        assert "Request payload too large" in data["error"]
+        assert data["details"][0]["type"] == "payload_size_error"
     
-    def test_normal_size_request_passes(self):
+    def test_normal_size_request_passes(self, client):
         """Test that normal-sized requests pass through middleware"""
         # This will be tested more thoroughly in endpoint tests
         # Here we just verify the middleware doesn't block normal requests
@@ -107,7 +82,7 @@ class TestRequestSizeMiddleware:
 class TestValidationErrorHandling:
     """Test request validation error handling"""
     
-    def test_missing_required_fields(self):
+    def test_missing_required_fields(self, client):
         """Test validation error when required fields are missing"""
         # Send empty POST request to trigger validation error
         response = client.post("/pipelines/parse", json={})
@@ -118,7 +93,7 @@ class TestValidationErrorHandling:
         assert len(data["details"]) > 0
         assert data["details"][0]["type"] == "validation_error"
     
-    def test_invalid_field_types(self):
+    def test_invalid_field_types(self, client):
         """Test validation error with invalid field types"""
         invalid_payload = {
             "nodes": "not_a_list",  # Should be a list
@@ -131,7 +106,7 @@ class TestValidationErrorHandling:
         assert "Request validation failed" in data["error"]
         assert any("validation_error" in detail["type"] for detail in data["details"])
     
-    def test_empty_nodes_list(self):
+    def test_empty_nodes_list(self, client):
         """Test validation error when nodes list is empty"""
         invalid_payload = {
             "nodes": [],  # Should have at least one node
@@ -143,7 +118,7 @@ class TestValidationErrorHandling:
         data = response.json()
         assert "Request validation failed" in data["error"]
     
-    def test_invalid_node_structure(self):
+    def test_invalid_node_structure(self, client):
         """Test validation error with invalid node structure"""
         invalid_payload = {
             "nodes": [{
@@ -160,7 +135,7 @@ class TestValidationErrorHandling:
         data = response.json()
         assert "Request validation failed" in data["error"]
     
-    def test_edge_referencing_nonexistent_node(self):
+    def test_edge_referencing_nonexistent_node(self, client):
         """Test validation error when edge references non-existent node"""
         invalid_payload = {
             "nodes": [{
@@ -183,7 +158,7 @@ class TestValidationErrorHandling:
         data = response.json()
         assert "Request validation failed" in data["error"]
     
-    def test_self_referencing_edge(self):
+    def test_self_referencing_edge(self, client):
         """Test validation error for self-referencing edge"""
         invalid_payload = {
             "nodes": [{
@@ -210,7 +185,7 @@ class TestValidationErrorHandling:
 class TestErrorResponseFormat:
     """Test error response format consistency"""
     
-    def test_validation_error_response_format(self):
+    def test_validation_error_response_format(self, client):
         """Test that validation errors follow the standard format"""
         response = client.post("/pipelines/parse", json={})
         assert response.status_code == 422
@@ -229,7 +204,7 @@ class TestErrorResponseFormat:
             assert "message" in detail
             # field is optional
     
-    def test_404_error_response_format(self):
+    def test_404_error_response_format(self, client):
         """Test 404 error response format"""
         response = client.get("/nonexistent-endpoint")
         assert response.status_code == 404
@@ -244,7 +219,7 @@ class TestErrorResponseFormat:
 class TestCORSHeaders:
     """Test CORS headers in responses"""
     
-    def test_cors_headers_present(self):
+    def test_cors_headers_present(self, client):
         """Test that CORS headers are present in responses"""
         response = client.get("/health")
         assert response.status_code == 200
@@ -253,7 +228,7 @@ class TestCORSHeaders:
         # In a real browser environment, these would be present
         # This test verifies the middleware is configured
     
-    def test_options_request_handling(self):
+    def test_options_request_handling(self, client):
         """Test OPTIONS request handling for CORS preflight"""
         response = client.options("/health")
         # OPTIONS requests should be handled by CORS middleware
@@ -264,7 +239,7 @@ class TestLogging:
     """Test logging functionality"""
     
     @patch('main.logger')
-    def test_validation_error_logging(self, mock_logger):
+    def test_validation_error_logging(self, mock_logger, client):
         """Test that validation errors are logged"""
         response = client.post("/pipelines/parse", json={})
         assert response.status_code == 422
@@ -285,7 +260,7 @@ class TestLogging:
 class TestRequestValidationIntegration:
     """Integration tests for request validation"""
     
-    def test_valid_minimal_pipeline(self):
+    def test_valid_minimal_pipeline(self, client):
         """Test that a valid minimal pipeline passes validation"""
         valid_payload = {
             "nodes": [{
@@ -303,32 +278,8 @@ class TestRequestValidationIntegration:
         # Once implemented, this should return 200 or appropriate success code
         assert response.status_code in [404, 200, 201]  # Endpoint not implemented yet
     
-    def test_valid_pipeline_with_edges(self):
+    def test_valid_pipeline_with_edges(self, client, two_node_chain_payload):
         """Test that a valid pipeline with edges passes validation"""
-        valid_payload = {
-            "nodes": [
-                {
-                    "id": "node1",
-                    "type": "input",
-                    "data": {"value": "test"},
-                    "position": {"x": 0, "y": 0}
-                },
-                {
-                    "id": "node2",
-                    "type": "output",
-                    "data": {},
-                    "position": {"x": 100, "y": 0}
-                }
-            ],
-            "edges": [{
-                "id": "edge1",
-                "source": "node1",
-                "target": "node2",
-                "sourceHandle": "out",
-                "targetHandle": "in"
-            }]
-        }
-        
-        response = client.post("/pipelines/parse", json=valid_payload)
+        response = client.post("/pipelines/parse", content=two_node_chain_payload, headers=JSON_HDR)
         # For now, we expect 404 since endpoint doesn't exist yet
         assert response.status_code in [404, 200, 201]  # Endpoint not implemented yet
\ No newline at end of file
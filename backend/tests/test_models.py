@@ -30,14 +30,12 @@ class TestDimensions:
         assert dims.height == 50
 
     def test_zero_dimensions_invalid(self):
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match="Input should be greater than 0"):
             Dimensions(width=0, height=50)
-        assert "Input should be greater than 0" in str(exc_info.value)
 
     def test_negative_dimensions_invalid(self):
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match="Input should be greater than 0"):
             Dimensions(width=100, height=-10)
-        assert "Input should be greater than 0" in str(exc_info.value)
 
 
 class TestSizeConstraints:
@@ -51,22 +49,20 @@ class TestSizeConstraints:
         assert constraints.maxWidth == 100
 
     def test_max_width_less_than_min_invalid(self):
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match="maxWidth must be greater than minWidth"):
             SizeConstraints(
                 minWidth=100, maxWidth=50,
                 minHeight=20, maxHeight=200,
                 padding=5
             )
-        assert "maxWidth must be greater than minWidth" in str(exc_info.value)
 
     def test_max_height_less_than_min_invalid(self):
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match="maxHeight must be greater than minHeight"):
             SizeConstraints(
                 minWidth=10, maxWidth=100,
                 minHeight=200, maxHeight=50,
                 padding=5
             )
-        assert "maxHeight must be greater than minHeight" in str(exc_info.value)
 
 
 class TestHandleDefinition:
@@ -104,14 +100,13 @@ class TestNodeData:
         assert node.data["value"] == "test"
 
     def test_empty_id_invalid(self):
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match="at least 1 character"):
             NodeData(
                 id="",
                 type="input",
                 data={},
                 position=Point(x=10, y=20)
             )
-        assert "at least 1 character" in str(exc_info.value)
 
 
 class TestEdgeData:
@@ -128,7 +123,7 @@ class TestEdgeData:
         assert edge.target == "node2"
 
     def test_self_referencing_edge_invalid(self):
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match="target cannot be the same as source"):
             EdgeData(
                 id="edge1",
                 source="node1",
@@ -136,7 +131,6 @@ class TestEdgeData:
                 sourceHandle="out",
                 targetHandle="in"
             )
-        assert "target cannot be the same as source" in str(exc_info.value)
 
 
 class TestPipelineRequest:
@@ -156,12 +150,11 @@ class TestPipelineRequest:
         assert len(pipeline.edges) == 0
 
     def test_empty_nodes_invalid(self):
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match="at least 1 item"):
             PipelineRequest(nodes=[], edges=[])
-        assert "at least 1 item" in str(exc_info.value)
 
     def test_edge_referencing_nonexistent_node_invalid(self):
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match="references non-existent node"):
             PipelineRequest(
                 nodes=[
                     NodeData(
@@ -181,7 +174,6 @@ class TestPipelineRequest:
                     )
                 ]
             )
-        assert "references non-existent node" in str(exc_info.value)
 
 
 class TestVariableMatch:
@@ -197,14 +189,13 @@ class TestVariableMatch:
         assert match.endIndex == 10
 
     def test_end_index_less_than_start_invalid(self):
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match="endIndex must be greater than startIndex"):
             VariableMatch(
                 name="variable1",
                 startIndex=10,
                 endIndex=5,
                 isValid=True
             )
-        assert "endIndex must be greater than startIndex" in str(exc_info.value)
 
 
 class TestValidationResult:
@@ -3,130 +3,101 @@ Integration tests for the /pipelines/parse endpoint
 """
 
 import pytest
-from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
 import json
+import orjson
 import time
-from main import app
 from models import PipelineRequest, NodeData, EdgeData, Point
+from .helpers import JSON_HDR, has, is_number, rj
 
-client = TestClient(app)
+
+_TEXT_HDR = {"Content-Type": "text/plain"}
+
+# Fields every successful /pipelines/parse response must carry
+_REQUIRED = frozenset({"num_nodes", "num_edges", "is_dag", "validation_errors", "processing_time_ms"})
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _warmup(client, single_node_payload):
+    """Push one tiny pipeline through the app so the first real test sees steady-state latency"""
+    response = client.post("/pipelines/parse", content=single_node_payload, headers=JSON_HDR)
+    assert response.status_code == 200, f"Warm-up request failed: {response.text}"
+
+
+_NODE1 = {"id": "node1", "type": "input", "data": {}, "position": {"x": 0, "y": 0}}
+_NODE2 = {"id": "node2", "type": "output", "data": {}, "position": {"x": 100, "y": 0}}
+
+# (payload fixture name, expected num_nodes, expected num_edges, expected is_dag) for well-formed pipelines
+VALID_CASES = [
+    pytest.param("single_node_payload", 1, 0, True, id="single_node"),
+    pytest.param("two_node_chain_payload", 2, 1, True, id="with_edges"),
+    pytest.param("complex_dag_payload", 4, 3, True, id="complex_dag"),
+    pytest.param("metadata_payload", 1, 0, True, id="with_metadata"),
+]
+
+# (payload, field path expected in the error details) for requests rejected by validation
+INVALID_CASES = [
+    pytest.param(orjson.dumps({"edges": []}), "nodes", id="missing_nodes_field"),
+    pytest.param(
+        orjson.dumps({"nodes": [{**_NODE1, "id": ""}], "edges": []}),  # Empty ID
+        "nodes.0.id",
+        id="invalid_node_id",
+    ),
+    pytest.param(
+        orjson.dumps({"nodes": [{**_NODE1, "position": {"x": "invalid", "y": 0}}], "edges": []}),
+        "nodes.0.position.x",
+        id="invalid_position_coordinates",
+    ),
+    pytest.param(
+        orjson.dumps({
+            "nodes": [_NODE1],
+            "edges": [{"id": "edge1", "source": "node1", "target": "nonexistent", "sourceHandle": "out", "targetHandle": "in"}]
+        }),
+        "edges",
+        id="edge_references_nonexistent_node",
+    ),
+    pytest.param(
+        orjson.dumps({
+            "nodes": [_NODE1, _NODE2],
+            "edges": [{"id": "edge1", "source": "node1", "target": "node2", "sourceHandle": "", "targetHandle": "in"}]  # Empty handle ID
+        }),
+        "edges.0.sourceHandle",
+        id="invalid_edge_handles",
+    ),
+]
 
 
 class TestPipelineParsing:
     """Test pipeline parsing endpoint functionality"""
     
-    def test_valid_single_node_pipeline(self):
-        """Test parsing a valid pipeline with a single node"""
-        valid_payload = {
-            "nodes": [{
-                "id": "node1",
-                "type": "input",
-                "data": {"value": "test"},
-                "position": {"x": 0, "y": 0}
-            }],
-            "edges": []
-        }
-        
-        response = client.post("/pipelines/parse", json=valid_payload)
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("payload_fixture,n,e,is_dag", VALID_CASES)
+    async def test_valid_pipeline(self, request, async_client, payload_fixture, n, e, is_dag):
+        """Test parsing well-formed pipelines"""
+        payload = request.getfixturevalue(payload_fixture)
+        response = await async_client.post("/pipelines/parse", content=payload, headers=JSON_HDR)
         assert response.status_code == 200
         
-        data = response.json()
-        assert data["num_nodes"] == 1
-        assert data["num_edges"] == 0
-        assert data["is_dag"] == True
+        data = rj(response)
+        assert data["num_nodes"] == n
+        assert data["num_edges"] == e
+        assert data["is_dag"] == is_dag
         assert data["validation_errors"] == []
-        assert "processing_time_ms" in data
-        assert isinstance(data["processing_time_ms"], (int, float))
+        assert is_number(data["processing_time_ms"])
         assert data["processing_time_ms"] >= 0
     
-    def test_valid_pipeline_with_edges(self):
-        """Test parsing a valid pipeline with nodes and edges"""
-        valid_payload = {
-            "nodes": [
-                {
-                    "id": "node1",
-                    "type": "input",
-                    "data": {"value": "test"},
-                    "position": {"x": 0, "y": 0}
-                },
-                {
-                    "id": "node2",
-                    "type": "output",
-                    "data": {},
-                    "position": {"x": 100, "y": 0}
-                }
-            ],
-            "edges": [{
-                "id": "edge1",
-                "source": "node1",
-                "target": "node2",
-                "sourceHandle": "out",
-                "targetHandle": "in"
-            }]
-        }
-        
-        response = client.post("/pipelines/parse", json=valid_payload)
-        assert response.status_code == 200
-        
-        data = response.json()
-        assert data["num_nodes"] == 2
-        assert data["num_edges"] == 1
-        assert data["is_dag"] == True
-        assert data["validation_errors"] == []
-        assert "processing_time_ms" in data
-    
-    def test_complex_valid_dag(self):
-        """Test parsing a complex valid DAG"""
-        valid_payload = {
-            "nodes": [
-                {"id": "input1", "type": "input", "data": {}, "position": {"x": 0, "y": 0}},
-                {"id": "input2", "type": "input", "data": {}, "position": {"x": 0, "y": 100}},
-                {"id": "process1", "type": "transform", "data": {}, "position": {"x": 200, "y": 50}},
-                {"id": "output1", "type": "output", "data": {}, "position": {"x": 400, "y": 50}}
-            ],
-            "edges": [
-                {"id": "e1", "source": "input1", "target": "process1", "sourceHandle": "out", "targetHandle": "in1"},
-                {"id": "e2", "source": "input2", "target": "process1", "sourceHandle": "out", "targetHandle": "in2"},
-                {"id": "e3", "source": "process1", "target": "output1", "sourceHandle": "out", "targetHandle": "in"}
-            ]
-        }
-        
-        response = client.post("/pipelines/parse", json=valid_payload)
-        assert response.status_code == 200
-        
-        data = response.json()
-        assert data["num_nodes"] == 4
-        assert data["num_edges"] == 3
-        assert data["is_dag"] == True
-        assert data["validation_errors"] == []
-    
-    def test_pipeline_with_cycle(self):
+    def test_pipeline_with_cycle(self, client, cyclic_payload):
         """Test parsing a pipeline with a cycle"""
-        cyclic_payload = {
-            "nodes": [
-                {"id": "node1", "type": "input", "data": {}, "position": {"x": 0, "y": 0}},
-                {"id": "node2", "type": "process", "data": {}, "position": {"x": 100, "y": 0}},
-                {"id": "node3", "type": "process", "data": {}, "position": {"x": 200, "y": 0}}
-            ],
-            "edges": [
-                {"id": "e1", "source": "node1", "target": "node2", "sourceHandle": "out", "targetHandle": "in"},
-                {"id": "e2", "source": "node2", "target": "node3", "sourceHandle": "out", "targetHandle": "in"},
-                {"id": "e3", "source": "node3", "target": "node1", "sourceHandle": "out", "targetHandle": "in"}  # Creates cycle
-            ]
-        }
-        
-        response = client.post("/pipelines/parse", json=cyclic_payload)
+        response = client.post("/pipelines/parse", content=cyclic_payload, headers=JSON_HDR)
         assert response.status_code == 200
         
-        data = response.json()
+        data = rj(response)
         assert data["num_nodes"] == 3
         assert data["num_edges"] == 3
         assert data["is_dag"] == False
         assert len(data["validation_errors"]) > 0
-        assert any("Cycle" in error for error in data["validation_errors"])
+        assert has(data["validation_errors"], "Cycle")
     
-    def test_pipeline_with_self_loop(self):
+    def test_pipeline_with_self_loop(self, client):
         """Test parsing a pipeline with a self-loop"""
         self_loop_payload = {
             "nodes": [
@@ -140,10 +111,10 @@ class TestPipelineParsing:
         # This should fail at the Pydantic validation level due to the model validator
         response = client.post("/pipelines/parse", json=self_loop_payload)
         assert response.status_code == 422
-        data = response.json()
+        data = rj(response)
         assert "Request validation failed" in data["error"]
     
-    def test_pipeline_with_duplicate_edges(self):
+    def test_pipeline_with_duplicate_edges(self, client):
         """Test parsing a pipeline with duplicate edges"""
         duplicate_edges_payload = {
             "nodes": [
@@ -159,279 +130,174 @@ class TestPipelineParsing:
         response = client.post("/pipelines/parse", json=duplicate_edges_payload)
         assert response.status_code == 200
         
-        data = response.json()
+        data = rj(response)
         assert data["num_nodes"] == 2
         assert data["num_edges"] == 2
         assert len(data["validation_errors"]) > 0
-        assert any("Duplicate edge" in error for error in data["validation_errors"])
+        assert has(data["validation_errors"], "Duplicate edge")
     
-    def test_empty_pipeline(self):
+    @pytest.mark.anyio
+    async def test_empty_pipeline(self, async_client):
         """Test parsing an empty pipeline (should fail validation)"""
         empty_payload = {
             "nodes": [],
             "edges": []
         }
         
-        response = client.post("/pipelines/parse", json=empty_payload)
+        response = await async_client.post("/pipelines/parse", json=empty_payload)
         assert response.status_code == 422
-        data = response.json()
+        data = rj(response)
         assert "Request validation failed" in data["error"]
-    
-    def test_pipeline_with_metadata(self):
-        """Test parsing a pipeline with metadata"""
-        payload_with_metadata = {
-            "nodes": [{
-                "id": "node1",
-                "type": "input",
-                "data": {"value": "test"},
-                "position": {"x": 0, "y": 0}
-            }],
-            "edges": [],
-            "metadata": {
-                "version": "2.0.0",
-                "created": "2024-01-01T00:00:00Z",
-                "modified": "2024-01-01T00:00:00Z"
-            }
-        }
-        
-        response = client.post("/pipelines/parse", json=payload_with_metadata)
-        assert response.status_code == 200
-        
-        data = response.json()
-        assert data["num_nodes"] == 1
-        assert data["num_edges"] == 0
-        assert data["is_dag"] == True
 
 
 class TestPipelineValidationErrors:
     """Test various validation error scenarios"""
     
-    def test_missing_nodes_field(self):
-        """Test error when nodes field is missing"""
-        invalid_payload = {
-            "edges": []
-        }
-        
-        response = client.post("/pipelines/parse", json=invalid_payload)
-        assert response.status_code == 422
-        data = response.json()
-        assert "Request validation failed" in data["error"]
-        assert any("nodes" in detail.get("field", "") for detail in data["details"])
-    
-    def test_invalid_node_id(self):
-        """Test error when node has invalid ID"""
-        invalid_payload = {
-            "nodes": [{
-                "id": "",  # Empty ID
-                "type": "input",
-                "data": {},
-                "position": {"x": 0, "y": 0}
-            }],
-            "edges": []
-        }
-        
-        response = client.post("/pipelines/parse", json=invalid_payload)
-        assert response.status_code == 422
-        data = response.json()
-        assert "Request validation failed" in data["error"]
-    
-    def test_invalid_position_coordinates(self):
-        """Test error when position coordinates are invalid"""
-        invalid_payload = {
-            "nodes": [{
-                "id": "node1",
-                "type": "input",
-                "data": {},
-                "position": {"x": "invalid", "y": 0}  # Invalid x coordinate
-            }],
-            "edges": []
-        }
-        
-        response = client.post("/pipelines/parse", json=invalid_payload)
+    @pytest.mark.parametrize("payload,field", INVALID_CASES)
+    def test_invalid_pipeline(self, client, payload, field):
+        """Test that malformed pipelines are rejected with the offending field reported"""
+        response = client.post("/pipelines/parse", content=payload, headers=JSON_HDR)
         assert response.status_code == 422
-        data = response.json()
-        assert "Request validation failed" in data["error"]
-    
-    def test_edge_references_nonexistent_node(self):
-        """Test error when edge references non-existent node"""
-        invalid_payload = {
-            "nodes": [{
-                "id": "node1",
-                "type": "input",
-                "data": {},
-                "position": {"x": 0, "y": 0}
-            }],
-            "edges": [{
-                "id": "edge1",
-                "source": "node1",
-                "target": "nonexistent",  # Non-existent node
-                "sourceHandle": "out",
-                "targetHandle": "in"
-            }]
-        }
-        
-        response = client.post("/pipelines/parse", json=invalid_payload)
-        assert response.status_code == 422
-        data = response.json()
-        assert "Request validation failed" in data["error"]
-    
-    def test_invalid_edge_handles(self):
-        """Test error when edge has invalid handle IDs"""
-        invalid_payload = {
-            "nodes": [
-                {"id": "node1", "type": "input", "data": {}, "position": {"x": 0, "y": 0}},
-                {"id": "node2", "type": "output", "data": {}, "position": {"x": 100, "y": 0}}
-            ],
-            "edges": [{
-                "id": "edge1",
-                "source": "node1",
-                "target": "node2",
-                "sourceHandle": "",  # Empty handle ID
-                "targetHandle": "in"
-            }]
-        }
-        
-        response = client.post("/pipelines/parse", json=invalid_payload)
-        assert response.status_code == 422
-        data = response.json()
+        data = rj(response)
         assert "Request validation failed" in data["error"]
+        assert has([detail.get("field", "") for detail in data["details"]], field)
 
 
 class TestPipelinePerformance:
     """Test performance characteristics of the endpoint"""
     
-    def test_large_pipeline_processing(self):
+    def test_large_pipeline_processing(self, client, large_payload):
         """Test processing a large pipeline"""
-        # Create a large but valid pipeline
-        nodes = []
-        edges = []
-        
-        # Create a chain of 100 nodes
-        for i in range(100):
-            nodes.append({
-                "id": f"node_{i}",
-                "type": "process",
-                "data": {"index": i},
-                "position": {"x": i * 50, "y": 0}
-            })
-            
-            if i > 0:
-                edges.append({
-                    "id": f"edge_{i-1}_{i}",
-                    "source": f"node_{i-1}",
-                    "target": f"node_{i}",
-                    "sourceHandle": "out",
-                    "targetHandle": "in"
-                })
-        
-        large_payload = {
-            "nodes": nodes,
-            "edges": edges
-        }
-        
-        start_time = time.time()
-        response = client.post("/pipelines/parse", json=large_payload)
-        end_time = time.time()
+        start_ns = time.perf_counter_ns()
+        response = client.post("/pipelines/parse", content=large_payload, headers=JSON_HDR)
+        elapsed_ms = (time.perf_counter_ns() - start_ns) / 1e6
         
         assert response.status_code == 200
-        data = response.json()
-        assert data["num_nodes"] == 100
-        assert data["num_edges"] == 99
-        assert data["is_dag"] == True
+        # The body is compact orjson output, so fixed fields can be checked as bytes
+        body = response.content
+        assert b'"num_nodes":100' in body
+        assert b'"num_edges":99' in body
+        assert b'"is_dag":true' in body
         
         # Verify processing time is reasonable (less than 5 seconds)
-        processing_time = end_time - start_time
-        assert processing_time < 5.0
+        assert elapsed_ms < 5000
         
         # Verify reported processing time is reasonable
+        data = orjson.loads(body)
         assert data["processing_time_ms"] < 5000
     
-    def test_processing_time_accuracy(self):
-        """Test that processing time is accurately reported"""
-        simple_payload = {
-            "nodes": [{
-                "id": "node1",
-                "type": "input",
-                "data": {},
-                "position": {"x": 0, "y": 0}
-            }],
-            "edges": []
+    def test_pipeline_above_thread_threshold(self, client, single_node_payload, monkeypatch):
+        """Test that only large pipelines are analyzed in a worker thread, with correct results"""
+        import main
+        from main import ANALYSIS_THREAD_MIN_EDGES
+        
+        offloaded = []
+        real_to_thread = main.asyncio.to_thread
+        
+        async def recording_to_thread(func, *args, **kwargs):
+            offloaded.append(func)
+            return await real_to_thread(func, *args, **kwargs)
+        
+        monkeypatch.setattr(main.asyncio, "to_thread", recording_to_thread)
+        
+        # Below the threshold the analysis runs inline on the event loop
+        response = client.post("/pipelines/parse", content=single_node_payload, headers=JSON_HDR)
+        assert response.status_code == 200
+        assert offloaded == []
+        
+        node_count = ANALYSIS_THREAD_MIN_EDGES + 1
+        payload = {
+            "nodes": [
+                {"id": f"node_{i}", "type": "process", "data": {}, "position": {"x": i, "y": 0}}
+                for i in range(node_count)
+            ],
+            "edges": [
+                {"id": f"edge_{i}", "source": f"node_{i}", "target": f"node_{i + 1}", "sourceHandle": "out", "targetHandle": "in"}
+                for i in range(node_count - 1)
+            ]
         }
         
-        response = client.post("/pipelines/parse", json=simple_payload)
+        response = client.post("/pipelines/parse", json=payload)
+        assert response.status_code == 200
+        assert offloaded == [main.get_pipeline_analysis]
+        data = rj(response)
+        assert data["num_edges"] == ANALYSIS_THREAD_MIN_EDGES
+        assert data["is_dag"] == True
+        assert data["validation_errors"] == []
+    
+    @pytest.mark.anyio
+    async def test_processing_time_accuracy(self, async_client, single_node_payload):
+        """Test that processing time is accurately reported"""
+        start_ns = time.perf_counter_ns()
+        response = await async_client.post("/pipelines/parse", content=single_node_payload, headers=JSON_HDR)
+        elapsed_ms = (time.perf_counter_ns() - start_ns) / 1e6
         assert response.status_code == 200
         
-        data = response.json()
+        data = rj(response)
         # Processing time should be non-negative and reasonable for a simple pipeline
         assert data["processing_time_ms"] >= 0
         assert data["processing_time_ms"] < 1000  # Should be less than 1 second
+        # Server-side time is a subset of the client-observed round trip
+        assert data["processing_time_ms"] <= elapsed_ms
+
+
+class _RaisingAnalyzer:
+    """DAGAnalyzer stand-in whose build_graph raises a preset exception"""
+    
+    def __init__(self, exc):
+        self._exc = exc
+    
+    def build_graph(self, *args, **kwargs):
+        raise self._exc
+
+
+@pytest.fixture
+def _patch_analyzer(monkeypatch):
+    """Make every DAGAnalyzer built during the test raise the given exception"""
+    def _apply(exc):
+        monkeypatch.setattr("dag_analyzer.DAGAnalyzer", lambda *args, **kwargs: _RaisingAnalyzer(exc))
+    return _apply
 
 
 class TestErrorHandling:
     """Test error handling in the endpoint"""
     
-    @patch('dag_analyzer.DAGAnalyzer')
-    def test_dag_analyzer_exception_handling(self, mock_dag_analyzer_class):
+    def test_dag_analyzer_exception_handling(self, client, single_node_payload, _patch_analyzer):
         """Test handling of exceptions from DAGAnalyzer"""
         # Mock DAGAnalyzer to raise an exception
-        mock_analyzer = MagicMock()
-        mock_analyzer.build_graph.side_effect = ValueError("Test error")
-        mock_dag_analyzer_class.return_value = mock_analyzer
-        
-        valid_payload = {
-            "nodes": [{
-                "id": "node1",
-                "type": "input",
-                "data": {},
-                "position": {"x": 0, "y": 0}
-            }],
-            "edges": []
-        }
+        _patch_analyzer(ValueError("Test error"))
         
-        response = client.post("/pipelines/parse", json=valid_payload)
+        response = client.post("/pipelines/parse", content=single_node_payload, headers=JSON_HDR)
         assert response.status_code == 422
-        data = response.json()
+        data = rj(response)
         assert "Pipeline validation failed" in data["error"]
         assert "Test error" in data["error"]
     
-    @patch('dag_analyzer.DAGAnalyzer')
-    def test_unexpected_exception_handling(self, mock_dag_analyzer_class):
+    def test_unexpected_exception_handling(self, client, single_node_payload, _patch_analyzer):
         """Test handling of unexpected exceptions"""
         # Mock DAGAnalyzer to raise an unexpected exception
-        mock_analyzer = MagicMock()
-        mock_analyzer.build_graph.side_effect = RuntimeError("Unexpected error")
-        mock_dag_analyzer_class.return_value = mock_analyzer
-        
-        valid_payload = {
-            "nodes": [{
-                "id": "node1",
-                "type": "input",
-                "data": {},
-                "position": {"x": 0, "y": 0}
-            }],
-            "edges": []
-        }
+        _patch_analyzer(RuntimeError("Unexpected error"))
         
-        response = client.post("/pipelines/parse", json=valid_payload)
+        response = client.post("/pipelines/parse", content=single_node_payload, headers=JSON_HDR)
         assert response.status_code == 500
-        data = response.json()
+        data = rj(response)
         assert "An unexpected error occurred" in data["error"]
     
-    def test_malformed_json(self):
+    def test_malformed_json(self, client):
         """Test handling of malformed JSON"""
         response = client.post(
             "/pipelines/parse",
-            data="invalid json",
-            headers={"Content-Type": "application/json"}
+            content="invalid json",
+            headers=JSON_HDR
         )
         assert response.status_code == 422
     
-    def test_content_type_validation(self):
+    def test_content_type_validation(self, client):
         """Test that endpoint requires JSON content type"""
         response = client.post(
             "/pipelines/parse",
-            data="some data",
-            headers={"Content-Type": "text/plain"}
+            content="some data",
+            headers=_TEXT_HDR
         )
         assert response.status_code == 422
 
@@ -439,36 +305,25 @@ class TestErrorHandling:
 class TestResponseFormat:
     """Test response format consistency"""
     
-    def test_success_response_format(self):
+    def test_success_response_format(self, client, single_node_payload):
         """Test that success responses follow the expected format"""
-        valid_payload = {
-            "nodes": [{
-                "id": "node1",
-                "type": "input",
-                "data": {},
-                "position": {"x": 0, "y": 0}
-            }],
-            "edges": []
-        }
-        
-        response = client.post("/pipelines/parse", json=valid_payload)
+        response = client.post("/pipelines/parse", content=single_node_payload, headers=JSON_HDR)
         assert response.status_code == 200
         
-        data = response.json()
+        data = rj(response)
         
         # Check all required fields are present
-        required_fields = ["num_nodes", "num_edges", "is_dag", "validation_errors", "processing_time_ms"]
-        for field in required_fields:
-            assert field in data, f"Missing required field: {field}"
+        missing = _REQUIRED - data.keys()
+        assert not missing, f"Missing required fields: {missing}"
         
         # Check field types
         assert isinstance(data["num_nodes"], int)
         assert isinstance(data["num_edges"], int)
         assert isinstance(data["is_dag"], bool)
         assert isinstance(data["validation_errors"], list)
-        assert isinstance(data["processing_time_ms"], (int, float))
+        assert is_number(data["processing_time_ms"])
     
-    def test_error_response_format(self):
+    def test_error_response_format(self, client):
         """Test that error responses follow the expected format"""
         invalid_payload = {
             "nodes": [],  # Invalid: empty nodes list
@@ -478,7 +333,7 @@ class TestResponseFormat:
         response = client.post("/pipelines/parse", json=invalid_payload)
         assert response.status_code == 422
         
-        data = response.json()
+        data = rj(response)
         
         # Check error response format
         assert "error" in data
@@ -487,52 +342,118 @@ class TestResponseFormat:
         assert isinstance(data["details"], list)
 
 
+@pytest.fixture(scope="session")
+def abcd_nodes():
+    return [
+        {"id": "a", "type": "input", "data": {}, "position": {"x": 0, "y": 0}},
+        {"id": "b", "type": "process", "data": {}, "position": {"x": 100, "y": 0}},
+        {"id": "c", "type": "process", "data": {}, "position": {"x": 200, "y": 0}},
+        {"id": "d", "type": "output", "data": {}, "position": {"x": 300, "y": 0}}
+    ]
+
+
+def _abc_edges(last_target):
+    """a -> b -> c -> last_target"""
+    return [
+        {"id": "e1", "source": "a", "target": "b", "sourceHandle": "out", "targetHandle": "in"},
+        {"id": "e2", "source": "b", "target": "c", "sourceHandle": "out", "targetHandle": "in"},
+        {"id": "e3", "source": "c", "target": last_target, "sourceHandle": "out", "targetHandle": "in"}
+    ]
+
+
+@pytest.fixture(scope="session")
+def abcd_dag_payload(abcd_nodes):
+    return orjson.dumps({"nodes": abcd_nodes, "edges": _abc_edges("d")})
+
+
+@pytest.fixture(scope="session")
+def abc_cyclic_payload(abcd_nodes):
+    return orjson.dumps({"nodes": abcd_nodes[:3], "edges": _abc_edges("a")})  # c -> a creates cycle
+
+
 class TestIntegrationWithDAGAnalyzer:
     """Test integration with DAGAnalyzer component"""
     
-    def test_dag_analyzer_integration(self):
+    def test_dag_analyzer_integration(self, client, abcd_dag_payload):
         """Test that DAGAnalyzer is properly integrated"""
-        # Test a scenario that exercises DAGAnalyzer functionality
-        complex_payload = {
-            "nodes": [
-                {"id": "a", "type": "input", "data": {}, "position": {"x": 0, "y": 0}},
-                {"id": "b", "type": "process", "data": {}, "position": {"x": 100, "y": 0}},
-                {"id": "c", "type": "process", "data": {}, "position": {"x": 200, "y": 0}},
-                {"id": "d", "type": "output", "data": {}, "position": {"x": 300, "y": 0}}
-            ],
-            "edges": [
-                {"id": "e1", "source": "a", "target": "b", "sourceHandle": "out", "targetHandle": "in"},
-                {"id": "e2", "source": "b", "target": "c", "sourceHandle": "out", "targetHandle": "in"},
-                {"id": "e3", "source": "c", "target": "d", "sourceHandle": "out", "targetHandle": "in"}
-            ]
-        }
-        
-        response = client.post("/pipelines/parse", json=complex_payload)
+        response = client.post("/pipelines/parse", content=abcd_dag_payload, headers=JSON_HDR)
         assert response.status_code == 200
         
-        data = response.json()
+        data = rj(response)
         assert data["is_dag"] == True
         assert data["validation_errors"] == []
     
-    def test_cycle_detection_integration(self):
+    def test_cycle_detection_integration(self, client, abc_cyclic_payload):
         """Test that cycle detection works through the endpoint"""
-        cyclic_payload = {
-            "nodes": [
-                {"id": "a", "type": "input", "data": {}, "position": {"x": 0, "y": 0}},
-                {"id": "b", "type": "process", "data": {}, "position": {"x": 100, "y": 0}},
-                {"id": "c", "type": "output", "data": {}, "position": {"x": 200, "y": 0}}
-            ],
-            "edges": [
-                {"id": "e1", "source": "a", "target": "b", "sourceHandle": "out", "targetHandle": "in"},
-                {"id": "e2", "source": "b", "target": "c", "sourceHandle": "out", "targetHandle": "in"},
-                {"id": "e3", "source": "c", "target": "a", "sourceHandle": "out", "targetHandle": "in"}  # Creates cycle
-            ]
-        }
-        
-        response = client.post("/pipelines/parse", json=cyclic_payload)
+        response = client.post("/pipelines/parse", content=abc_cyclic_payload, headers=JSON_HDR)
         assert response.status_code == 200
         
-        data = response.json()
+        data = rj(response)
         assert data["is_dag"] == False
         assert len(data["validation_errors"]) > 0
-        assert any("Cycle" in error for error in data["validation_errors"])
\ No newline at end of file
+        assert has(data["validation_errors"], "Cycle")
+
+
+class TestAnalysisCache:
+    """Test caching of DAG analysis results across identical requests"""
+    
+    def test_repeated_pipeline_hits_cache(self, client):
+        """Test that resubmitting the same graph reuses the cached analysis"""
+        nodes = [
+            {"id": f"n{i}", "type": "process", "data": {}, "position": {"x": i * 50, "y": 0}}
+            for i in range(20)
+        ]
+        edges = [
+            {"id": f"e{i}", "source": f"n{i}", "target": f"n{i + 1}", "sourceHandle": "out", "targetHandle": "in"}
+            for i in range(19)
+        ]
+        edges.append({"id": "back", "source": "n19", "target": "n0", "sourceHandle": "out", "targetHandle": "in"})
+        payload = {"nodes": nodes, "edges": edges}
+        
+        first = client.post("/pipelines/parse", json=payload)
+        hits_before = rj(client.get("/pipelines/cache"))["hits"]
+        second = client.post("/pipelines/parse", json=payload)
+        stats = rj(client.get("/pipelines/cache"))
+        
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert stats["hits"] == hits_before + 1
+        assert rj(first)["is_dag"] is False
+        assert rj(second)["validation_errors"] == rj(first)["validation_errors"]
+    
+    def test_cache_evicts_least_recently_used(self):
+        """Test that the cache drops the least recently used entry once full"""
+        from main import AnalysisCache
+        
+        cache = AnalysisCache(maxsize=2)
+        cache.put(b"a", (True, ()))
+        cache.put(b"b", (True, ()))
+        assert cache.get(b"a") == (True, ())  # b is now least recently used
+        cache.put(b"c", (False, ("Cycle detected",)))
+        
+        assert cache.get(b"b") is None
+        assert cache.get(b"a") == (True, ())
+        assert cache.get(b"c") == (False, ("Cycle detected",))
+        assert cache.stats()["size"] == 2
+    
+    def test_cache_bounds_retained_error_bytes(self):
+        """Test that cached error lists are bounded in total and per entry"""
+        import sys
+        from main import AnalysisCache
+        
+        errors = ("x" * 1000,)
+        entry_bytes = sys.getsizeof(errors[0])
+        cache = AnalysisCache(maxsize=512, max_bytes=32 * entry_bytes)
+        for i in range(40):
+            cache.put(b"k%d" % i, (False, errors))
+        
+        stats = cache.stats()
+        assert stats["size"] == 32
+        assert stats["bytes"] == 32 * entry_bytes
+        assert cache.get(b"k39") is not None
+        assert cache.get(b"k0") is None
+        
+        # A single result above max_bytes // 16 is not cached at all
+        cache.put(b"huge", (False, ("x" * (4 * entry_bytes),)))
+        assert cache.get(b"huge") is None
+        assert cache.stats()["bytes"] == stats["bytes"]